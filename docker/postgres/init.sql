@@ -3,7 +3,7 @@
 
 -- ============================================
 -- Raw Logs Table
--- Stores the raw JSON logs from the blockchain
+-- Stores the raw logs from the blockchain
 -- ============================================
 CREATE TABLE IF NOT EXISTS raw_logs (
     id SERIAL PRIMARY KEY,
@@ -11,11 +11,11 @@ CREATE TABLE IF NOT EXISTS raw_logs (
     transaction_hash VARCHAR(66) NOT NULL,
     log_index INTEGER NOT NULL,
     contract_address VARCHAR(42) NOT NULL,
-    topics JSONB NOT NULL,
-    data TEXT,
+    topics TEXT[] NOT NULL,
+    data BYTEA,
     block_timestamp TIMESTAMP NOT NULL,
     indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(transaction_hash, log_index)
+    UNIQUE(transaction_hash, log_index)  -- arbiter index for the indexer's ON CONFLICT DO NOTHING
 );
 
 -- Index for efficient querying
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Contract Compiler
+Compiles the PurchaseStore contract at image build time and writes the
+solc standard-json output to an artifact file for the deployer to load.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from solcx import compile_standard, install_solc
+
+SOLC_VERSION = "0.8.19"
+
+
+def compile_contract(contract_path: Path) -> dict:
+    """Compile the Solidity contract."""
+    print(f"Installing solc version {SOLC_VERSION}...")
+    install_solc(SOLC_VERSION)
+
+    print(f"Compiling contract: {contract_path}")
+    with open(contract_path, "r") as f:
+        contract_source = f.read()
+
+    compiled_sol = compile_standard(
+        {
+            "language": "Solidity",
+            "sources": {"PurchaseStore.sol": {"content": contract_source}},
+            "settings": {
+                "outputSelection": {
+                    "*": {
+                        "*": ["abi", "metadata", "evm.bytecode", "evm.sourceMap"]
+                    }
+                }
+            },
+        },
+        solc_version=SOLC_VERSION,
+    )
+
+    return compiled_sol
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: compile_contract.py <contract.sol> <artifact.json>")
+        sys.exit(1)
+
+    contract_path = Path(sys.argv[1])
+    artifact_path = Path(sys.argv[2])
+
+    compiled_sol = compile_contract(contract_path)
+
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(artifact_path, "w") as f:
+        json.dump(compiled_sol, f)
+
+    print(f"Artifact written to: {artifact_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Contract Deployer
-Compiles and deploys the PurchaseStore contract to the local devnet.
+Deploys the PurchaseStore contract (compiled at image build time) to the local devnet.
 Outputs contract address and ABI to a JSON file for other services to use.
 """
 
@@ -9,15 +9,34 @@ import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from web3 import Web3
-from solcx import compile_standard, install_solc
 
 # Configuration
 RPC_URL = os.getenv("RPC_URL", "http://localhost:8545")
 CONTRACT_OUTPUT = os.getenv("CONTRACT_OUTPUT", "/app/output/contract_info.json")
-SOLC_VERSION = "0.8.19"
+ARTIFACT_PATH = os.getenv("ARTIFACT_PATH", "/app/artifacts/PurchaseStore.json")
+
+
+def create_web3() -> Web3:
+    """Create a Web3 HTTP client that reuses a pooled keep-alive session.
+
+    web3 caches the session per thread, so each thread must build its own client.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return Web3(Web3.HTTPProvider(RPC_URL, session=session, request_kwargs={"timeout": 10}))
 
 
 def wait_for_rpc(w3: Web3, max_retries: int = 30, delay: int = 2) -> bool:
@@ -34,34 +53,27 @@ def wait_for_rpc(w3: Web3, max_retries: int = 30, delay: int = 2) -> bool:
     return False
 
 
-def compile_contract(contract_path: Path) -> dict:
-    """Compile the Solidity contract."""
-    print(f"Installing solc version {SOLC_VERSION}...")
-    install_solc(SOLC_VERSION)
-
-    print(f"Compiling contract: {contract_path}")
-    with open(contract_path, "r") as f:
-        contract_source = f.read()
-
-    compiled_sol = compile_standard(
-        {
-            "language": "Solidity",
-            "sources": {"PurchaseStore.sol": {"content": contract_source}},
-            "settings": {
-                "outputSelection": {
-                    "*": {
-                        "*": ["abi", "metadata", "evm.bytecode", "evm.sourceMap"]
-                    }
-                }
-            },
-        },
-        solc_version=SOLC_VERSION,
-    )
+def load_compiled_contract() -> dict:
+    """Load the contract compiled at image build time, compiling locally if it is missing."""
+    if Path(ARTIFACT_PATH).exists():
+        print(f"Loading compiled contract from: {ARTIFACT_PATH}")
+        with open(ARTIFACT_PATH, "r") as f:
+            return json.load(f)
+
+    # Running outside the image: fall back to compiling the source with solcx
+    contract_path = Path("/app/contracts/PurchaseStore.sol")
+    if not contract_path.exists():
+        # Try local path
+        contract_path = Path("contracts/PurchaseStore.sol")
+    if not contract_path.exists():
+        print(f"ERROR: Contract file not found")
+        sys.exit(1)
 
-    return compiled_sol
+    from compile_contract import compile_contract
+    return compile_contract(contract_path)
 
 
-def deploy_contract(w3: Web3, compiled_sol: dict) -> tuple[str, list]:
+def deploy_contract(w3: Web3, compiled_sol: dict, gas_price: int) -> tuple[str, list]:
     """Deploy the contract and return address and ABI."""
     # Get bytecode and ABI
     bytecode = compiled_sol["contracts"]["PurchaseStore.sol"]["PurchaseStore"]["evm"]["bytecode"]["object"]
@@ -84,7 +96,7 @@ def deploy_contract(w3: Web3, compiled_sol: dict) -> tuple[str, list]:
         "from": deployer_account,
         "nonce": w3.eth.get_transaction_count(deployer_account),
         "gas": 2000000,
-        "gasPrice": w3.eth.gas_price,
+        "gasPrice": gas_price,
     })
 
     # Send transaction (dev mode auto-signs)
@@ -103,12 +115,21 @@ def deploy_contract(w3: Web3, compiled_sol: dict) -> tuple[str, list]:
     return contract_address, abi
 
 
-def fund_wallets(w3: Web3, num_wallets: int = 3) -> list[dict]:
+def send_funding_transaction(tx: dict):
+    """Send one funding transaction from a worker thread with that thread's own client."""
+    return create_web3().eth.send_transaction(tx)
+
+
+def fund_wallets(w3: Web3, gas_price: int, num_wallets: int = 3) -> list[dict]:
     """Create and fund wallets for the simulator."""
     print(f"\nCreating and funding {num_wallets} wallets...")
 
     dev_account = w3.eth.accounts[0]
     wallets = []
+    funding_txs = []
+
+    # Pre-compute nonces so all funding transactions can be sent at once
+    base_nonce = w3.eth.get_transaction_count(dev_account)
 
     for i in range(num_wallets):
         # Create new account
@@ -120,15 +141,21 @@ def fund_wallets(w3: Web3, num_wallets: int = 3) -> list[dict]:
         wallets.append(wallet_info)
 
         # Fund with 10 ETH
-        tx_hash = w3.eth.send_transaction({
+        funding_txs.append({
             "from": dev_account,
             "to": account.address,
             "value": w3.to_wei(10, "ether"),
+            "nonce": base_nonce + i,
             "gas": 21000,
-            "gasPrice": w3.eth.gas_price,
+            "gasPrice": gas_price,
         })
+
+    with ThreadPoolExecutor(max_workers=num_wallets) as executor:
+        tx_hashes = list(executor.map(send_funding_transaction, funding_txs))
+
+    for i, tx_hash in enumerate(tx_hashes):
         w3.eth.wait_for_transaction_receipt(tx_hash)
-        print(f"  Wallet {i + 1}: {account.address} funded with 10 ETH")
+        print(f"  Wallet {i + 1}: {wallets[i]['address']} funded with 10 ETH")
 
     return wallets
 
@@ -158,29 +185,23 @@ def main():
     print("=" * 60)
 
     # Connect to RPC
-    w3 = Web3(Web3.HTTPProvider(RPC_URL))
+    w3 = create_web3()
 
     if not wait_for_rpc(w3):
         print("ERROR: Could not connect to RPC")
         sys.exit(1)
 
-    # Find contract file
-    contract_path = Path("/app/contracts/PurchaseStore.sol")
-    if not contract_path.exists():
-        # Try local path
-        contract_path = Path("contracts/PurchaseStore.sol")
-    if not contract_path.exists():
-        print(f"ERROR: Contract file not found")
-        sys.exit(1)
+    # Load compiled contract
+    compiled_sol = load_compiled_contract()
 
-    # Compile
-    compiled_sol = compile_contract(contract_path)
+    # Read the gas price once for every transaction this run sends
+    gas_price = w3.eth.gas_price
 
     # Deploy
-    contract_address, abi = deploy_contract(w3, compiled_sol)
+    contract_address, abi = deploy_contract(w3, compiled_sol, gas_price)
 
     # Create and fund wallets
-    wallets = fund_wallets(w3, num_wallets=3)
+    wallets = fund_wallets(w3, gas_price, num_wallets=3)
 
     # Save contract info
     save_contract_info(contract_address, abi, wallets, CONTRACT_OUTPUT)
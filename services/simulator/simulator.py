@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 """
 Purchase Simulator
-Generates random purchase transactions from multiple wallets.
+Generates random purchase transactions from multiple wallets in parallel.
 """
 
+import itertools
 import json
 import os
 import random
 import sys
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from threading import Lock, Thread
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from web3 import Web3
 
 # Configuration
@@ -18,6 +25,10 @@ RPC_URL = os.getenv("RPC_URL", "http://localhost:8545")
 CONTRACT_INFO_PATH = os.getenv("CONTRACT_INFO_PATH", "/app/contract_info/contract_info.json")
 PURCHASE_INTERVAL_MIN = int(os.getenv("PURCHASE_INTERVAL_MIN", "2"))
 PURCHASE_INTERVAL_MAX = int(os.getenv("PURCHASE_INTERVAL_MAX", "5"))
+GAS_PRICE_TTL = int(os.getenv("GAS_PRICE_TTL", "5"))
+MIN_PRIORITY_FEE = Web3.to_wei(1, "gwei")
+RECEIPT_POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", "1"))
+RECEIPT_TIMEOUT = int(os.getenv("RECEIPT_TIMEOUT", "30"))
 
 # Product catalog (must match contract)
 PRODUCTS = {
@@ -42,6 +53,22 @@ def load_contract_info(path: str) -> dict:
     raise FileNotFoundError(f"Contract info not found at {path}")
 
 
+def create_web3() -> Web3:
+    """Create a Web3 HTTP client that reuses a pooled keep-alive session.
+
+    web3 caches the session per thread, so each thread must build its own client.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return Web3(Web3.HTTPProvider(RPC_URL, session=session, request_kwargs={"timeout": 10}))
+
+
 def wait_for_rpc(w3: Web3, max_retries: int = 30) -> bool:
     """Wait for RPC endpoint to be available."""
     print(f"Connecting to RPC: {RPC_URL}")
@@ -56,30 +83,174 @@ def wait_for_rpc(w3: Web3, max_retries: int = 30) -> bool:
     return False
 
 
-def make_purchase(w3: Web3, contract, wallet: dict, product_id: int, quantity: int):
-    """Execute a purchase transaction."""
+class GasPriceCache:
+    """Thread-safe cache of transaction fee fields, refreshed at most every `ttl` seconds."""
+
+    def __init__(self, ttl: float = GAS_PRICE_TTL):
+        self.ttl = ttl
+        self.value = None
+        self.fetched_at = 0.0
+        self.lock = Lock()
+
+    def fetch(self, w3: Web3) -> dict:
+        """Read current fees: EIP-1559 fields from eth_feeHistory, or a legacy gas price."""
+        history = w3.eth.fee_history(1, "latest", [50])
+        base_fees = history.get("baseFeePerGas") or []
+        if not base_fees or base_fees[-1] == 0:
+            return {"gasPrice": w3.eth.gas_price}
+
+        # baseFeePerGas ends with the next block's base fee; allow it to double before the tx lands
+        tip = max(history["reward"][0][0], MIN_PRIORITY_FEE)
+        return {
+            "maxFeePerGas": 2 * base_fees[-1] + tip,
+            "maxPriorityFeePerGas": tip,
+        }
+
+    def get(self, w3: Web3) -> dict:
+        """Return cached fees, refreshing them with the calling thread's client when stale."""
+        with self.lock:
+            now = time.monotonic()
+            if self.value is None or now - self.fetched_at > self.ttl:
+                self.value = self.fetch(w3)
+                self.fetched_at = now
+            return self.value
+
+
+def make_purchase(w3: Web3, contract, wallet: dict, tx_params: dict, product_id: int, quantity: int):
+    """Sign and send a purchase transaction without waiting for it to be mined."""
     product = PRODUCTS[product_id]
     price_wei = w3.to_wei(product["price_eth"] * quantity, "ether")
 
-    # Build transaction
+    # Build transaction (nonce, fee fields and chain id are supplied by the caller)
     tx = contract.functions.purchase(product_id, quantity).build_transaction({
         "from": wallet["address"],
         "value": price_wei,
-        "nonce": w3.eth.get_transaction_count(wallet["address"]),
         "gas": 100000,
-        "gasPrice": w3.eth.gas_price,
+        **tx_params,
     })
 
     # Sign and send
     signed_tx = w3.eth.account.sign_transaction(tx, wallet["private_key"])
     # Handle both old and new web3.py API
     raw_tx = getattr(signed_tx, 'rawTransaction', None) or signed_tx.raw_transaction
-    tx_hash = w3.eth.send_raw_transaction(raw_tx)
+    return w3.eth.send_raw_transaction(raw_tx)
+
+
+class ReceiptPoller:
+    """Resolves receipt futures for in-flight transactions, one batched RPC call per poll."""
+
+    def __init__(self, interval: float = RECEIPT_POLL_INTERVAL, timeout: float = RECEIPT_TIMEOUT):
+        self.interval = interval
+        self.timeout = timeout
+        self.inflight = {}  # tx hash -> (future, sent_at)
+        self.lock = Lock()
+
+    def track(self, tx_hash: str) -> Future:
+        """Register a sent transaction and return a future for its receipt."""
+        future = Future()
+        with self.lock:
+            self.inflight[tx_hash] = (future, time.monotonic())
+        return future
+
+    def poll(self, w3: Web3):
+        """Look up every in-flight receipt in a single JSON-RPC batch."""
+        with self.lock:
+            tx_hashes = list(self.inflight)
+        if not tx_hashes:
+            return
+
+        # Raw provider batch: unmined transactions come back as a null result
+        # instead of raising TransactionNotFound for the whole batch
+        responses = w3.provider.make_batch_request([
+            ("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes
+        ])
+
+        now = time.monotonic()
+        with self.lock:
+            for tx_hash, response in zip(tx_hashes, responses):
+                future, sent_at = self.inflight[tx_hash]
+                receipt = response.get("result")
+                if receipt:
+                    del self.inflight[tx_hash]
+                    future.set_result({
+                        "blockNumber": int(receipt["blockNumber"], 16),
+                        "gasUsed": int(receipt["gasUsed"], 16),
+                        "status": int(receipt["status"], 16),
+                    })
+                elif now - sent_at > self.timeout:
+                    del self.inflight[tx_hash]
+                    future.set_exception(TimeoutError(f"No receipt for {tx_hash} after {self.timeout}s"))
+
+    def run(self):
+        w3 = create_web3()
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll(w3)
+            except Exception as e:
+                print(f"ERROR: receipt polling failed: {e}")
+
+
+def report_receipt(purchase_number: int, future: Future):
+    """Print the outcome of a purchase once its receipt is known."""
+    try:
+        receipt = future.result()
+    except Exception as e:
+        print(f"ERROR: [Purchase #{purchase_number}] {e}")
+        return
+
+    print(
+        f"[Purchase #{purchase_number}] Block: {receipt['blockNumber']} | "
+        f"Gas Used: {receipt['gasUsed']} | "
+        f"Status: {'Success' if receipt['status'] == 1 else 'Failed'}"
+    )
+
+
+def run_wallet(contract_info: dict, wallet: dict, gas_prices: GasPriceCache, chain_id: int,
+               receipts: ReceiptPoller, purchase_numbers):
+    """Send random purchases from one wallet, tracking its nonce locally."""
+    # Built in this thread so sends use the pooled, retrying session
+    w3 = create_web3()
+    contract = w3.eth.contract(address=contract_info["contract_address"], abi=contract_info["abi"])
+    nonce = None
+
+    while True:
+        try:
+            if nonce is None:
+                nonce = w3.eth.get_transaction_count(wallet["address"], "pending")
+
+            # Random selection
+            product_id = random.randint(1, 5)
+            quantity = random.randint(1, 3)
+            product = PRODUCTS[product_id]
 
-    # Wait for receipt
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+            # Execute purchase
+            tx_hash = make_purchase(w3, contract, wallet, {
+                "nonce": nonce,
+                "chainId": chain_id,
+                **gas_prices.get(w3),
+            }, product_id, quantity)
+            nonce += 1
+
+            tx_hash = tx_hash.to_0x_hex()
+            purchase_number = next(purchase_numbers)
+            print(
+                f"[Purchase #{purchase_number}] Wallet: {wallet['address'][:10]}... | "
+                f"{product['name']} (ID: {product_id}) x{quantity} | "
+                f"Total: {product['price_eth'] * quantity:.4f} ETH | "
+                f"TX Hash: {tx_hash[:20]}..."
+            )
+            receipts.track(tx_hash).add_done_callback(partial(report_receipt, purchase_number))
 
-    return tx_hash.hex(), receipt
+            # Random delay
+            delay = random.uniform(PURCHASE_INTERVAL_MIN, PURCHASE_INTERVAL_MAX)
+            time.sleep(delay)
+
+        except Exception as e:
+            print(f"ERROR: [{wallet['address'][:10]}...] {e}")
+            # Re-read the nonce from the node in case the failed send left a gap
+            nonce = None
+            time.sleep(5)
 
 
 def run_simulator():
@@ -89,7 +260,7 @@ def run_simulator():
     print("=" * 60)
 
     # Connect to Web3
-    w3 = Web3(Web3.HTTPProvider(RPC_URL))
+    w3 = create_web3()
     if not wait_for_rpc(w3):
         print("ERROR: Could not connect to RPC")
         sys.exit(1)
@@ -97,15 +268,11 @@ def run_simulator():
     # Load contract info
     contract_info = load_contract_info(CONTRACT_INFO_PATH)
     contract_address = contract_info["contract_address"]
-    abi = contract_info["abi"]
     wallets = contract_info["wallets"]
 
     print(f"Contract address: {contract_address}")
     print(f"Number of wallets: {len(wallets)}")
 
-    # Create contract instance
-    contract = w3.eth.contract(address=contract_address, abi=abi)
-
     # Print wallet balances
     print("\nWallet balances:")
     for i, wallet in enumerate(wallets):
@@ -116,40 +283,17 @@ def run_simulator():
     print("Starting purchase simulation...")
     print("=" * 60 + "\n")
 
-    purchase_count = 0
-
-    while True:
-        try:
-            # Random selection
-            wallet = random.choice(wallets)
-            product_id = random.randint(1, 5)
-            quantity = random.randint(1, 3)
-            product = PRODUCTS[product_id]
-
-            print(f"[Purchase #{purchase_count + 1}]")
-            print(f"  Wallet: {wallet['address'][:10]}...")
-            print(f"  Product: {product['name']} (ID: {product_id})")
-            print(f"  Quantity: {quantity}")
-            print(f"  Total: {product['price_eth'] * quantity:.4f} ETH")
+    chain_id = w3.eth.chain_id
+    gas_prices = GasPriceCache()
+    receipts = ReceiptPoller()
+    purchase_numbers = itertools.count(1)
 
-            # Execute purchase
-            tx_hash, receipt = make_purchase(w3, contract, wallet, product_id, quantity)
-
-            print(f"  TX Hash: {tx_hash[:20]}...")
-            print(f"  Block: {receipt['blockNumber']}")
-            print(f"  Gas Used: {receipt['gasUsed']}")
-            print(f"  Status: {'Success' if receipt['status'] == 1 else 'Failed'}")
-            print()
-
-            purchase_count += 1
+    Thread(target=receipts.run, daemon=True).start()
 
-            # Random delay
-            delay = random.uniform(PURCHASE_INTERVAL_MIN, PURCHASE_INTERVAL_MAX)
-            time.sleep(delay)
-
-        except Exception as e:
-            print(f"ERROR: {e}")
-            time.sleep(5)
+    # One sending thread per wallet so each wallet pipelines its own nonces
+    with ThreadPoolExecutor(max_workers=len(wallets)) as executor:
+        for wallet in wallets:
+            executor.submit(run_wallet, contract_info, wallet, gas_prices, chain_id, receipts, purchase_numbers)
 
 
 if __name__ == "__main__":